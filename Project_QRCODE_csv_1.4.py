@@ -1,15 +1,15 @@
 # Importações necessárias
 import streamlit as st
 import pandas as pd
-import numpy as np
-from pyzbar.pyzbar import decode
-from PIL import Image, ExifTags
-import altair as alt
-import time
+from PIL import Image
 from datetime import datetime
-import os
 import uuid
 import base64
+from inventario_csv import COLUNAS_ORDENACAO as COLUNAS_TABELA, get_inventario
+from leitor_qr import scan_qr_code
+from agregados import montar_serie, periodo_de
+from graficos import spec_categorias, spec_historico
+from etiquetas import folhas_pdf, pacote_png
 
 # Configuração da página
 st.set_page_config(
@@ -37,20 +37,18 @@ st.markdown("""
         text-align: center;
     }
     
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 24px;
-    }
-    .stTabs [data-baseweb="tab"] {
+    div[data-testid="stPageLink"] a {
         height: 50px;
-        white-space: pre-wrap;
+        justify-content: center;
         background-color: white;
         border-radius: 4px 4px 0px 0px;
-        gap: 1px;
         padding-top: 10px;
         padding-bottom: 10px;
     }
-    .stTabs [aria-selected="true"] {
+    div[data-testid="stPageLink"] a[aria-current="page"] {
         background-color: #008000 !important;
+    }
+    div[data-testid="stPageLink"] a[aria-current="page"] span {
         color: white !important;
     }
     div[data-testid="stForm"] {
@@ -105,20 +103,24 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Inventário em CSV (um por processo, compartilhado com a API)
+inventario = get_inventario()
+
+CATEGORIAS = ["Painel", "Relé", "Ferramentas", "Amplificador", "Outros"]
+
+GRANULARIDADES_HISTORICO = {"Mês": "mes", "Semana": "semana", "Dia": "dia"}
+
 # Funções auxiliares
 def load_data():
-    """Carrega os dados do arquivo CSV ou cria um novo se não existir"""
-    if os.path.exists("inventario.csv"):
-        return pd.read_csv("inventario.csv")
-    else:
-        # Criar arquivo com colunas padrão
-        df = pd.DataFrame(columns=["codigo", "nome", "descricao", "categoria", "quantidade", "data_cadastro"])
-        df.to_csv("inventario.csv", index=False)
-        return df
+    """Carrega os dados do arquivo CSV (com as quantidades já movimentadas)"""
+    return inventario.load_data()
+
+def versao_dados():
+    """Versão atual dos dados cadastrados (muda a cada gravação do CSV)"""
+    return inventario.versao
 
 def add_item(codigo, nome, descricao, categoria="Outros", quantidade=1):
     """Adiciona um novo item ao CSV"""
-    df = load_data()
     nova_linha = {
         "codigo": codigo,
         "nome": nome,
@@ -127,82 +129,179 @@ def add_item(codigo, nome, descricao, categoria="Outros", quantidade=1):
         "quantidade": quantidade,
         "data_cadastro": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
-    df = pd.concat([df, pd.DataFrame([nova_linha])], ignore_index=True)
-    df.to_csv("inventario.csv", index=False)
-    return nova_linha
+    return inventario.add_item(nova_linha)
 
 def buscar_item(codigo):
     """Busca um item pelo código"""
-    df = load_data()
-    resultado = df[df["codigo"] == codigo]
-    if len(resultado) > 0:
-        return resultado.iloc[0].to_dict()
-    else:
-        return None
+    return inventario.buscar_item(codigo)
+
+def buscar_itens(codigos):
+    """Busca vários códigos de uma vez; retorna ({codigo: item}, códigos não encontrados)"""
+    return inventario.buscar_itens(codigos)
+
+def pagina_itens(**filtros):
+    """Retorna (linhas da página, total filtrado) com filtro e ordenação feitos no servidor"""
+    return inventario.pagina_itens(**filtros)
 
-def scan_qr_code(image):
-    """Escaneia QR Code com detecção de orientação"""
-    # Verificar e corrigir orientação da imagem
-    if isinstance(image, Image.Image):
+def buscar_texto(consulta, limite=20):
+    """Busca itens por nome, descrição e categoria (prefixo e aproximação), do mais relevante ao menos"""
+    return inventario.buscar_texto(consulta, limite)
+
+def registrar_movimento(codigo, delta, operador=""):
+    """Registra uma entrada (delta > 0) ou saída (delta < 0) e retorna a nova quantidade"""
+    return inventario.registrar_movimento(codigo, delta, operador)
+
+def mostrar_movimentacao(item, chave):
+    """Exibe os botões de entrada/saída de estoque para o item"""
+    def _movimentar(sinal):
+        delta = sinal * st.session_state[f"mov_qtd_{chave}"]
         try:
-            # Tentar obter informações de orientação
-            for orientation in ExifTags.TAGS.keys():
-                if ExifTags.TAGS[orientation] == 'Orientation':
-                    break
-            
-            exif = image._getexif()
-            if exif is not None:
-                exif_orientation = exif.get(orientation)
-                
-                # Corrigir orientação baseado no valor EXIF
-                if exif_orientation == 2:
-                    image = image.transpose(Image.FLIP_LEFT_RIGHT)
-                elif exif_orientation == 3:
-                    image = image.transpose(Image.ROTATE_180)
-                elif exif_orientation == 4:
-                    image = image.transpose(Image.FLIP_TOP_BOTTOM)
-                elif exif_orientation == 5:
-                    image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_90)
-                elif exif_orientation == 6:
-                    image = image.transpose(Image.ROTATE_270)
-                elif exif_orientation == 7:
-                    image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_270)
-                elif exif_orientation == 8:
-                    image = image.transpose(Image.ROTATE_90)
-        except (AttributeError, KeyError, IndexError):
-            # Se não conseguir obter/processar EXIF, continuar assim mesmo
-            pass
-        
-        # Converter para formato OpenCV
-        img = np.array(image.convert('RGB'))
-        img = img[:, :, ::-1].copy()  # Converter RGB para BGR
-    else:
-        return None
+            nova_quantidade = registrar_movimento(item["codigo"], delta, st.session_state.get("operador", ""))
+            st.toast(f"✅ Estoque de {item['nome']} atualizado: {nova_quantidade}")
+        except ValueError as erro:
+            st.toast(f"❌ {erro}")
     
-    # Tentar decodificar normalmente
-    decoded_objects = decode(img)
+    with st.form(f"movimento_{chave}"):
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            st.number_input("Quantidade a movimentar", min_value=1, value=1, key=f"mov_qtd_{chave}")
+        with col2:
+            st.form_submit_button("📥 Entrada", on_click=_movimentar, args=(1,))
+        with col3:
+            st.form_submit_button("📤 Saída", on_click=_movimentar, args=(-1,))
+
+@st.fragment
+def mostrar_tabela_itens():
+    """Tabela do dashboard paginada no servidor: só a página visível vai para o navegador"""
+    def _voltar_primeira_pagina():
+        st.session_state.tabela_pagina = 1
     
-    # Se não detectar nada, tentar com rotações adicionais
-    if not decoded_objects:
-        # Testar 90 graus
-        img_90 = np.rot90(img)
-        decoded_objects = decode(img_90)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        categoria = st.selectbox("Categoria", ["Todas"] + CATEGORIAS, key="tabela_categoria", on_change=_voltar_primeira_pagina)
+    with col2:
+        prefixo_nome = st.text_input("Nome começa com", key="tabela_nome", on_change=_voltar_primeira_pagina)
+    with col3:
+        periodo = st.date_input("Período de cadastro", value=(), format="DD/MM/YYYY", key="tabela_periodo", on_change=_voltar_primeira_pagina)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        ordenar_por = st.selectbox("Ordenar por", COLUNAS_TABELA, index=COLUNAS_TABELA.index("data_cadastro"), key="tabela_ordem", on_change=_voltar_primeira_pagina)
+    with col2:
+        decrescente = st.toggle("Ordem decrescente", value=True, key="tabela_decrescente", on_change=_voltar_primeira_pagina)
+    with col3:
+        por_pagina = st.selectbox("Itens por página", [25, 50, 100, 250], index=1, key="tabela_por_pagina", on_change=_voltar_primeira_pagina)
+    
+    filtros = {
+        "categoria": None if categoria == "Todas" else categoria,
+        "prefixo_nome": prefixo_nome.strip(),
+        "data_inicio": periodo[0].isoformat() if len(periodo) > 0 else None,
+        "data_fim": periodo[-1].isoformat() if len(periodo) > 0 else None,
+        "ordenar_por": ordenar_por,
+        "decrescente": decrescente,
+        "limite": por_pagina,
+    }
+    
+    pagina = st.session_state.get("tabela_pagina", 1)
+    linhas, total = pagina_itens(offset=(pagina - 1) * por_pagina, **filtros)
+    total_paginas = max(1, -(-total // por_pagina))
+    if pagina > total_paginas:
+        # O filtro encolheu o resultado: volta para a última página existente
+        pagina = st.session_state.tabela_pagina = total_paginas
+        linhas, total = pagina_itens(offset=(pagina - 1) * por_pagina, **filtros)
+    
+    st.dataframe(pd.DataFrame(linhas, columns=COLUNAS_TABELA), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Página", min_value=1, max_value=total_paginas, value=pagina, key="tabela_pagina")
+    with col2:
+        inicio = (pagina - 1) * por_pagina
+        st.caption(f"Mostrando {min(inicio + 1, total)}–{min(inicio + por_pagina, total)} de {total} itens · página {pagina} de {total_paginas}")
+
+@st.fragment
+def mostrar_busca_texto():
+    """Busca por nome, descrição ou categoria para quem não tem o código em mãos"""
+    st.markdown("### 🔤 Buscar por Nome ou Descrição")
+    consulta = st.text_input("Nome, descrição ou categoria", placeholder="Ex.: relé térmico, parafuso inox...", key="busca_texto")
+    if not consulta.strip():
+        return
+    
+    resultados = buscar_texto(consulta)
+    if not resultados:
+        st.markdown('<div class="error-msg">❌ Nenhum item encontrado para esta busca.</div>', unsafe_allow_html=True)
+        return
+    
+    tabela = pd.DataFrame(resultados, columns=COLUNAS_TABELA)
+    selecao = st.dataframe(tabela, use_container_width=True, hide_index=True, on_select="rerun", selection_mode="single-row", key="busca_texto_resultados")
+    st.caption("Selecione uma linha para ver os detalhes do item.")
+    if selecao.selection.rows:
+        item = resultados[selecao.selection.rows[0]]
+        mostrar_item_card(item)
+        mostrar_movimentacao(item, "busca_texto")
+
+@st.fragment
+def mostrar_etiquetas():
+    """Gera etiquetas com QR Code (folha PDF ou PNGs) para códigos informados ou uma categoria"""
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        texto_codigos = st.text_area("Códigos (um por linha; vazio = usar a categoria)", key="etiquetas_codigos", height=100)
+    with col2:
+        categoria = st.selectbox("Categoria", ["Todas"] + CATEGORIAS, key="etiquetas_categoria")
+        formato = st.radio("Formato", ["Folha PDF (A4, 3 x 8)", "PNGs (ZIP)"], key="etiquetas_formato")
+    
+    if st.button("🏷️ Gerar Etiquetas", key="etiquetas_gerar"):
+        codigos = [linha.strip() for linha in texto_codigos.splitlines() if linha.strip()]
+        if codigos:
+            encontrados, faltantes = buscar_itens(codigos)
+            itens = [encontrados[codigo] for codigo in dict.fromkeys(codigos) if codigo in encontrados]
+            if faltantes:
+                st.warning(f"{len(faltantes)} código(s) não cadastrado(s): {', '.join(sorted(faltantes)[:10])}")
+        else:
+            itens, _ = pagina_itens(categoria=None if categoria == "Todas" else categoria,
+                                    ordenar_por="codigo", decrescente=False, limite=10**9)
         
-        # Testar 180 graus
-        if not decoded_objects:
-            img_180 = np.rot90(img_90)
-            decoded_objects = decode(img_180)
-            
-            # Testar 270 graus
-            if not decoded_objects:
-                img_270 = np.rot90(img_180)
-                decoded_objects = decode(img_270)
-    
-    if decoded_objects:
-        # Retornar o primeiro QR code encontrado
-        return decoded_objects[0].data.decode('utf-8')
-    else:
-        return None
+        if not itens:
+            st.markdown('<div class="error-msg">❌ Nenhum item para gerar etiquetas.</div>', unsafe_allow_html=True)
+        else:
+            with st.spinner(f"Gerando {len(itens)} etiqueta(s)..."):
+                if formato.startswith("Folha"):
+                    st.session_state.etiquetas_arquivo = (folhas_pdf(itens), "etiquetas.pdf", "application/pdf")
+                else:
+                    st.session_state.etiquetas_arquivo = (pacote_png(itens), "etiquetas.zip", "application/zip")
+    
+    if "etiquetas_arquivo" in st.session_state:
+        dados, nome_arquivo, tipo = st.session_state.etiquetas_arquivo
+        st.download_button("📥 Baixar Etiquetas", dados, file_name=nome_arquivo, mime=tipo, key="etiquetas_baixar")
+
+@st.fragment
+def mostrar_historico_cadastros():
+    """Gráfico de cadastros por período a partir dos agregados (zoom em mês, semana ou dia)"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        rotulo = st.radio("Agrupar por", list(GRANULARIDADES_HISTORICO), horizontal=True, key="historico_granularidade")
+    with col2:
+        periodo = st.date_input("Período", value=(), format="DD/MM/YYYY", key="historico_periodo")
+    with col3:
+        por_categoria = st.toggle("Separar por categoria", key="historico_por_categoria")
+    
+    granularidade = GRANULARIDADES_HISTORICO[rotulo]
+    inicio = periodo_de(granularidade, periodo[0]) if len(periodo) > 0 else None
+    fim = periodo_de(granularidade, periodo[-1]) if len(periodo) > 0 else None
+    spec = _spec_historico(versao_dados(), granularidade, inicio, fim, por_categoria, rotulo)
+    st.vega_lite_chart(spec, use_container_width=True)
+
+# Especificações dos gráficos em cache pela versão dos dados: reexecuções sem
+# cadastro novo (digitação na busca, troca de aba etc.) não remontam os gráficos
+@st.cache_data(max_entries=8)
+def _spec_categorias(versao):
+    _, _, categorias = get_stats()
+    return spec_categorias(categorias)
+
+@st.cache_data(max_entries=64)
+def _spec_historico(versao, granularidade, inicio, fim, por_categoria, rotulo):
+    serie = montar_serie(granularidade, consultar_agregados(granularidade, inicio, fim), por_categoria)
+    return spec_historico(serie, rotulo, granularidade, por_categoria)
 
 def mostrar_item_card(item):
     """Exibe as informações do item em um card estilizado"""
@@ -232,19 +331,18 @@ def mostrar_item_card(item):
     </div>
     """, unsafe_allow_html=True)
 
+def consultar_agregados(granularidade, inicio=None, fim=None, categorias=None):
+    """Retorna [(periodo, categoria, contagem)] dos cadastros agregados no período"""
+    return inventario.consultar_agregados(granularidade, inicio, fim, categorias)
+
 def get_stats():
     """Obtém estatísticas para o painel"""
-    df = load_data()
-    total_items = len(df)
-    
-    # Cadastros de hoje
-    hoje = datetime.now().strftime("%Y-%m-%d")
-    cadastros_hoje = len(df[df['data_cadastro'].str.startswith(hoje)])
-    
-    # Categorias
-    categorias = df['categoria'].value_counts().to_dict() if 'categoria' in df.columns else {}
-    
-    return total_items, cadastros_hoje, categorias
+    return inventario.get_stats()
+
+@st.cache_data(max_entries=8)
+def get_stats_em_cache(versao):
+    """Estatísticas do painel, recalculadas só quando os dados mudam"""
+    return get_stats()
 
 # Interface principal
 st.markdown('<p class="main-header">SISTEMA DE INVENTÁRIO QR CODE</p>', unsafe_allow_html=True)
@@ -256,7 +354,7 @@ with st.sidebar:
     
     # Estatísticas
     st.markdown("### 📊 Estatísticas")
-    total_items, cadastros_hoje, categorias = get_stats()
+    total_items, cadastros_hoje, categorias = get_stats_em_cache(versao_dados())
     
     col1, col2 = st.columns(2)
     col1.metric("Total de Itens", total_items)
@@ -264,11 +362,12 @@ with st.sidebar:
     
     # Filtros e outras opções
     st.markdown("### 🔍 Opções")
+    st.text_input("Operador", key="operador", placeholder="Nome de quem movimenta o estoque")
     if st.button("🔄 Atualizar Dados"):
         st.rerun()
     
     if st.button("📤 Exportar Dados"):
-        # Lógica para exportar
+        # Lógica para exportar (com as quantidades já movimentadas)
         df = load_data()
         csv = df.to_csv(index=False)
         b64 = base64.b64encode(csv.encode()).decode()  # Converter para base64
@@ -284,11 +383,16 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
-# Conteúdo principal com abas
-tab1, tab2, tab3 = st.tabs(["📷 Escaneamento", "🔍 Busca Manual", "📊 Dashboard"])
+# Conteúdo principal: cada aba é uma página e só a página ativa é executada,
+# então interagir no escaneamento não recalcula o dashboard. Dentro das páginas,
+# fragmentos fazem cliques e envios de formulário reexecutarem apenas a parte
+# afetada (sem CSS, barra lateral e navegação). As estatísticas da barra
+# lateral são atualizadas na próxima reexecução completa.
 
-# Aba de escaneamento
-with tab1:
+# Aba de escaneamento (fragmento: escanear e cadastrar reexecutam só esta aba)
+@st.fragment
+def aba_escaneamento():
+    """Lê o QR Code da câmera ou de uma imagem e mostra (ou cadastra) o item"""
     st.markdown('<div class="card">', unsafe_allow_html=True)
     
     col1, col2 = st.columns([1, 1])
@@ -315,7 +419,6 @@ with tab1:
             
             # Adiciona uma mensagem de processamento
             with st.spinner("🔍 Processando QR code..."):
-                time.sleep(0.7)  # Pequeno delay para efeito visual
                 qr_data = scan_qr_code(image)
             
             if qr_data:
@@ -328,6 +431,7 @@ with tab1:
                     # Mostrar as informações do item existente
                     st.markdown('<div class="success-msg">✅ Item encontrado na base de dados!</div>', unsafe_allow_html=True)
                     mostrar_item_card(item)
+                    mostrar_movimentacao(item, "escaneamento")
                 else:
                     # Interface para registrar novo item
                     st.markdown('<div class="warning-msg">⚠️ Item não encontrado. Deseja cadastrar este item?</div>', unsafe_allow_html=True)
@@ -338,7 +442,7 @@ with tab1:
                         
                         col1, col2 = st.columns(2)
                         with col1:
-                            categoria = st.selectbox("Categoria", ["Painel", "Relé", "Ferramentas", "Amplificador", "Outros"])
+                            categoria = st.selectbox("Categoria", CATEGORIAS)
                         with col2:
                             quantidade = st.number_input("Quantidade", min_value=1, value=1)
                         
@@ -369,10 +473,10 @@ with tab1:
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Aba de busca manual
-# Correção para a parte da aba de busca manual
-
-with tab2:
+# Aba de busca manual (fragmento: botões e formulário reexecutam só esta aba)
+@st.fragment
+def aba_busca_manual():
+    """Busca e cadastro de itens digitando o código ou o nome"""
     st.markdown('<div class="card">', unsafe_allow_html=True)
     
     # Checar estado de sessão ou inicializar se não existir
@@ -415,6 +519,8 @@ with tab2:
                             # Configurar para mostrar formulário de cadastro
                             st.session_state.codigo_para_cadastro = codigo_busca
                             st.session_state.mostrar_formulario_cadastro = True
+        
+        mostrar_busca_texto()
     else:
         # Formulário de cadastro
         st.markdown(f"""
@@ -427,7 +533,7 @@ with tab2:
         
         col1, col2 = st.columns(2)
         with col1:
-            categoria = st.selectbox("Categoria", ["Painel", "Relé", "Ferramentas", "Amplificador", "Outros"])
+            categoria = st.selectbox("Categoria", CATEGORIAS)
         with col2:
             quantidade = st.number_input("Quantidade", min_value=1, value=1)
         
@@ -451,6 +557,7 @@ with tab2:
     if 'resultado_busca' in st.session_state and st.session_state.resultado_busca:
         st.markdown('<div class="success-msg">✅ Item encontrado na base de dados!</div>', unsafe_allow_html=True)
         mostrar_item_card(st.session_state.item_encontrado)
+        mostrar_movimentacao(st.session_state.item_encontrado, "busca")
         # Limpar estado após mostrar
         del st.session_state.resultado_busca
         del st.session_state.item_encontrado
@@ -477,61 +584,31 @@ with tab2:
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Aba de dashboard
-with tab3:
+def aba_dashboard():
+    """Gráficos e lista paginada do inventário"""
     st.markdown('<div class="card">', unsafe_allow_html=True)
     
     st.markdown("### 📊 Análise de Inventário")
     
-    df = load_data()
+    total_items, _, categorias = get_stats_em_cache(versao_dados())
     
-    if len(df) > 0:
-        # Converter a coluna de data para datetime
-        if 'data_cadastro' in df.columns:
-            df['data_cadastro'] = pd.to_datetime(df['data_cadastro'])
-            
-            # Gráfico de itens por categoria
-            if 'categoria' in df.columns:
-                st.markdown("#### Distribuição por Categoria")
-                categoria_counts = df['categoria'].value_counts().reset_index()
-                categoria_counts.columns = ['categoria', 'contagem']
-                
-                chart = alt.Chart(categoria_counts).mark_bar().encode(
-                    x=alt.X('categoria:N', title='Categoria', sort='-y'),
-                    y=alt.Y('contagem:Q', title='Quantidade de Itens'),
-                    color=alt.Color('categoria:N', legend=None)
-                ).properties(
-                    height=300
-                )
-                
-                st.altair_chart(chart, use_container_width=True)
-            
-            # Gráfico de cadastros por mês
-            st.markdown("#### Histórico de Cadastros")
-            df['mes'] = df['data_cadastro'].dt.strftime('%Y-%m')
-            cadastros_por_mes = df.groupby('mes').size().reset_index(name='contagem')
-            
-            line_chart = alt.Chart(cadastros_por_mes).mark_line(point=True).encode(
-                x=alt.X('mes:N', title='Mês', sort=None),
-                y=alt.Y('contagem:Q', title='Itens Cadastrados'),
-                tooltip=['mes', 'contagem']
-            ).properties(
-                height=300
-            )
-            
-            st.altair_chart(line_chart, use_container_width=True)
-            
-            # Exibir tabela de itens
-            st.markdown("#### Lista de Itens Cadastrados")
-            
-            # Converter de volta para exibição
-            if 'data_cadastro' in df.columns:
-                df['data_cadastro'] = df['data_cadastro'].dt.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Colunas para exibir
-            colunas_exibir = ['codigo', 'nome', 'categoria', 'quantidade', 'data_cadastro']
-            df_exibir = df[colunas_exibir] if all(col in df.columns for col in colunas_exibir) else df
-            
-            st.dataframe(df_exibir, use_container_width=True)
+    if total_items > 0:
+        # Gráfico de itens por categoria
+        if categorias:
+            st.markdown("#### Distribuição por Categoria")
+            st.vega_lite_chart(_spec_categorias(versao_dados()), use_container_width=True)
+        
+        # Gráfico de cadastros por período
+        st.markdown("#### Histórico de Cadastros")
+        mostrar_historico_cadastros()
+        
+        # Exibir tabela de itens (paginada)
+        st.markdown("#### Lista de Itens Cadastrados")
+        mostrar_tabela_itens()
+        
+        # Etiquetas para impressão
+        st.markdown("#### Etiquetas com QR Code")
+        mostrar_etiquetas()
     else:
         st.markdown("""
         <div class="info-msg">
@@ -541,6 +618,19 @@ with tab3:
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+paginas = [
+    st.Page(aba_escaneamento, title="Escaneamento", icon="📷", url_path="escaneamento", default=True),
+    st.Page(aba_busca_manual, title="Busca Manual", icon="🔍", url_path="busca"),
+    st.Page(aba_dashboard, title="Dashboard", icon="📊", url_path="dashboard"),
+]
+pagina_ativa = st.navigation(paginas, position="hidden")
+
+# Barra de abas (links de navegação)
+for coluna, pagina in zip(st.columns(len(paginas)), paginas):
+    coluna.page_link(pagina, use_container_width=True)
+
+pagina_ativa.run()
+
 # Rodapé
 st.markdown("""
 <div style="text-align: center; margin-top: 30px; padding: 20px; border-top: 1px solid #E5E7EB; color: #6B7280;">
@@ -0,0 +1,94 @@
+# Agregados de cadastros por dia, semana e mês, por categoria
+#
+# Os períodos são inteiros (contados a partir de 1970-01-01), calculados de
+# forma vetorizada sobre datetime64, sem formatar datas como texto. Os
+# gráficos consultam estes contadores, cujo tamanho depende do número de
+# períodos e categorias e não do número de itens.
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+GRANULARIDADES = ["dia", "semana", "mes"]
+
+# 1970-01-01 foi uma quinta-feira: somar 3 dias alinha as semanas na segunda-feira
+_DESLOCAMENTO_SEMANA = 3
+
+
+def periodos(granularidade, datas):
+    """Converte datas (datetime64) para o inteiro do período"""
+    datas = np.asarray(datas, dtype="datetime64[ns]")
+    if granularidade == "mes":
+        return datas.astype("datetime64[M]").astype(np.int64)
+    dias = datas.astype("datetime64[D]").astype(np.int64)
+    if granularidade == "semana":
+        return (dias + _DESLOCAMENTO_SEMANA) // 7
+    return dias
+
+
+def inicio_periodo(granularidade, valores):
+    """Converte inteiros de período de volta para a data de início (datetime64)"""
+    valores = np.asarray(valores, dtype=np.int64)
+    if granularidade == "mes":
+        return valores.astype("datetime64[M]").astype("datetime64[ns]")
+    if granularidade == "semana":
+        valores = valores * 7 - _DESLOCAMENTO_SEMANA
+    return valores.astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def periodo_de(granularidade, data):
+    """Período de uma única data (date, datetime ou string "AAAA-MM-DD...")"""
+    return int(periodos(granularidade, [pd.Timestamp(data).to_datetime64()])[0])
+
+
+class CuboCadastros:
+    """Contagem de cadastros por (período, categoria) em cada granularidade"""
+
+    def __init__(self):
+        self._contagens = {granularidade: defaultdict(int) for granularidade in GRANULARIDADES}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def construir(cls, datas, categorias):
+        """Monta o cubo de uma vez a partir das colunas data_cadastro e categoria"""
+        cubo = cls()
+        datas = pd.to_datetime(pd.Series(datas), errors="coerce", format="mixed")
+        validas = datas.notna().to_numpy()
+        categorias = pd.Series(categorias).fillna("Outros").to_numpy()[validas]
+        datas = datas.to_numpy()[validas]
+        for granularidade in GRANULARIDADES:
+            grupos = pd.DataFrame({"periodo": periodos(granularidade, datas), "categoria": categorias})
+            contagem = grupos.groupby(["periodo", "categoria"], sort=False).size()
+            cubo._contagens[granularidade].update(contagem.to_dict())
+        return cubo
+
+    def adicionar(self, data, categoria):
+        """Conta um novo cadastro em todas as granularidades"""
+        momento = [pd.Timestamp(data).to_datetime64()]
+        with self._lock:
+            for granularidade in GRANULARIDADES:
+                periodo = int(periodos(granularidade, momento)[0])
+                self._contagens[granularidade][(periodo, categoria or "Outros")] += 1
+
+    def linhas(self, granularidade, inicio=None, fim=None, categorias=None):
+        """Retorna [(periodo, categoria, contagem)] com períodos entre inicio e fim (inclusive)"""
+        with self._lock:
+            itens = list(self._contagens[granularidade].items())
+        return [
+            (periodo, categoria, contagem)
+            for (periodo, categoria), contagem in itens
+            if (inicio is None or periodo >= inicio)
+            and (fim is None or periodo <= fim)
+            and (not categorias or categoria in categorias)
+        ]
+
+
+def montar_serie(granularidade, linhas, por_categoria=False):
+    """DataFrame pronto para o gráfico (periodo como data, categoria, contagem)"""
+    df = pd.DataFrame(linhas, columns=["periodo", "categoria", "contagem"])
+    if not por_categoria:
+        df = df.groupby("periodo", as_index=False)["contagem"].sum()
+    df = df.sort_values("periodo")
+    df["periodo"] = inicio_periodo(granularidade, df["periodo"].to_numpy())
+    return df.reset_index(drop=True)
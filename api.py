@@ -0,0 +1,145 @@
+# API HTTP sem interface para leitores de mão e integrações (WMS)
+#
+# Usa o mesmo armazenamento das telas Streamlit (inventario_csv ou a réplica
+# local do Supabase) e o mesmo leitor de QR Code, sem o custo de reexecutar o
+# script a cada requisição. O servidor fala HTTP/1.1 com keep-alive: um
+# cliente que reaproveita a conexão faz milhares de consultas por segundo.
+#
+# Uso:
+#   python api.py                                    (CSV, porta 8000)
+#   INVENTARIO_BACKEND=supabase python api.py --porta 8080
+#
+# Endpoints:
+#   GET  /saude                      estado e versão dos dados
+#   POST /decodificar                imagem (corpo ou campo "imagem") -> código e item
+#   GET  /itens/<codigo>             um item
+#   POST /itens/busca                {"codigos": [...]} -> encontrados e faltantes
+#   POST /itens                      cadastra {"codigo", "nome", "descricao", "categoria", "quantidade"}
+import argparse
+import io
+import math
+import os
+from datetime import datetime
+
+from flask import Flask, jsonify, request
+from PIL import Image, UnidentifiedImageError
+from werkzeug.serving import WSGIRequestHandler
+
+from leitor_qr import scan_qr_code
+
+BACKEND = os.environ.get("INVENTARIO_BACKEND", "csv")
+
+# Limite de códigos por consulta em lote
+MAX_CODIGOS_LOTE = 5000
+
+
+def get_armazenamento(backend=BACKEND):
+    """Armazenamento compartilhado do processo (mesmo usado pelas telas)"""
+    if backend == "supabase":
+        from replica_local import get_replica
+        return get_replica()
+    from inventario_csv import get_inventario
+    return get_inventario()
+
+
+def _json(item):
+    """Item pronto para JSON (NaN vira null)"""
+    if item is None:
+        return None
+    return {chave: None if isinstance(valor, float) and math.isnan(valor) else valor for chave, valor in item.items()}
+
+
+def _erro(mensagem, status):
+    return jsonify({"erro": mensagem}), status
+
+
+def criar_app(armazenamento=None):
+    """Cria a aplicação Flask sobre o armazenamento informado (ou o do processo)"""
+    armazenamento = armazenamento or get_armazenamento()
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+    app.json.sort_keys = False
+
+    @app.get("/saude")
+    def saude():
+        return jsonify({"status": "ok", "versao": str(armazenamento.versao)})
+
+    @app.post("/decodificar")
+    def decodificar():
+        arquivo = request.files.get("imagem")
+        dados = arquivo.read() if arquivo else request.get_data()
+        if not dados:
+            return _erro("Envie a imagem no corpo ou no campo 'imagem'", 400)
+        try:
+            imagem = Image.open(io.BytesIO(dados))
+        except UnidentifiedImageError:
+            return _erro("Imagem inválida", 400)
+
+        codigo = scan_qr_code(imagem)
+        if codigo is None:
+            return _erro("Nenhum QR Code encontrado na imagem", 422)
+        return jsonify({"codigo": codigo, "item": _json(armazenamento.buscar_item(codigo))})
+
+    @app.get("/itens/<codigo>")
+    def item(codigo):
+        encontrado = armazenamento.buscar_item(codigo)
+        if encontrado is None:
+            return _erro("Item não cadastrado", 404)
+        return jsonify(_json(encontrado))
+
+    @app.post("/itens/busca")
+    def busca_lote():
+        codigos = (request.get_json(silent=True) or {}).get("codigos")
+        if not isinstance(codigos, list):
+            return _erro("Informe 'codigos' como lista", 400)
+        if len(codigos) > MAX_CODIGOS_LOTE:
+            return _erro(f"No máximo {MAX_CODIGOS_LOTE} códigos por consulta", 413)
+        encontrados, faltantes = armazenamento.buscar_itens(codigos)
+        return jsonify({
+            "encontrados": {codigo: _json(item) for codigo, item in encontrados.items()},
+            "faltantes": sorted(faltantes),
+        })
+
+    @app.post("/itens")
+    def cadastrar():
+        dados = request.get_json(silent=True) or {}
+        codigo = str(dados.get("codigo") or "").strip()
+        nome = str(dados.get("nome") or "").strip()
+        if not codigo or not nome:
+            return _erro("Os campos 'codigo' e 'nome' são obrigatórios", 400)
+        try:
+            quantidade = int(dados.get("quantidade", 1))
+        except (TypeError, ValueError):
+            return _erro("'quantidade' deve ser um número inteiro", 400)
+        if armazenamento.buscar_item(codigo) is not None:
+            return _erro("Código já cadastrado", 409)
+
+        nova_linha = {
+            "codigo": codigo,
+            "nome": nome,
+            "descricao": dados.get("descricao") or "",
+            "categoria": dados.get("categoria") or "Outros",
+            "quantidade": quantidade,
+            "data_cadastro": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        item = armazenamento.add_item(nova_linha)
+        if not item:
+            return _erro("Erro ao adicionar item ao banco de dados", 502)
+        return jsonify(_json(item)), 201
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP do inventário QR Code")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=8000)
+    args = parser.parse_args()
+
+    # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive)
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    criar_app().run(host=args.host, port=args.porta, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# Geração de etiquetas com QR Code para os itens do inventário
+#
+# Cada etiqueta traz o QR Code do código, o nome, a categoria e o código em
+# texto. Saídas: PNG (uma etiqueta), SVG (vetorial) e folhas PDF A4 com várias
+# etiquetas por página. As etiquetas renderizadas ficam em cache no disco pelo
+# hash do conteúdo, e lotes grandes são renderizados em vários processos.
+#
+# Uso em linha de comando:
+#   python etiquetas.py --saida etiquetas.pdf                   (todo o inventario.csv)
+#   python etiquetas.py --categoria Relé --saida reles.pdf
+#   python etiquetas.py --codigos A1 A2 --formato png --saida etiquetas.zip
+import argparse
+import hashlib
+import io
+import json
+import os
+import textwrap
+from functools import lru_cache
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+PASTA_CACHE = os.environ.get("ETIQUETAS_CACHE", ".cache_etiquetas")
+
+# Folha A4 a 200 dpi com 3 x 8 etiquetas
+DPI = 200
+TAMANHO_FOLHA = (1654, 2339)
+MARGEM_FOLHA = 60
+COLUNAS_FOLHA = 3
+LINHAS_FOLHA = 8
+
+# Abaixo disso não compensa abrir processos
+LOTE_MINIMO_PROCESSOS = 64
+
+# Muda quando o desenho da etiqueta mudar (invalida o cache)
+VERSAO_LAYOUT = 1
+
+ZONA_SILENCIOSA = 4  # módulos de margem branca em volta do QR Code
+
+
+def matriz_qr(texto):
+    """Matriz booleana (True = módulo escuro) do QR Code, com zona silenciosa"""
+    import cv2  # só quem gera etiquetas precisa do OpenCV
+
+    imagem = cv2.QRCodeEncoder.create().encode(str(texto))
+    escuros = imagem < 128
+    linhas = np.flatnonzero(escuros.any(axis=1))
+    colunas = np.flatnonzero(escuros.any(axis=0))
+    escuros = escuros[linhas[0]:linhas[-1] + 1, colunas[0]:colunas[-1] + 1]
+    # O padrão localizador tem 7 módulos: a primeira sequência escura dá o tamanho do módulo
+    primeira_linha = escuros[0]
+    modulo = max(1, int(np.argmin(primeira_linha)) // 7) if not primeira_linha.all() else 1
+    escuros = escuros[::modulo, ::modulo]
+    return np.pad(escuros, ZONA_SILENCIOSA, constant_values=False)
+
+
+def _chave(item, largura, altura, formato):
+    conteudo = [VERSAO_LAYOUT, formato, largura, altura,
+                str(item["codigo"]), str(item.get("nome") or ""), str(item.get("categoria") or "")]
+    return hashlib.sha256(json.dumps(conteudo, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _fonte(tamanho):
+    return ImageFont.load_default(size=tamanho)
+
+
+def desenhar_etiqueta(item, largura=551, altura=292):
+    """Desenha a etiqueta (QR Code à esquerda, textos à direita) como imagem PIL"""
+    etiqueta = Image.new("L", (largura, altura), 255)
+    margem = altura // 12
+
+    # QR Code escalado para a altura da etiqueta, sem interpolação
+    matriz = matriz_qr(item["codigo"])
+    lado = altura - 2 * margem
+    escala = max(1, lado // matriz.shape[0])
+    qr = Image.fromarray(np.where(matriz, 0, 255).astype(np.uint8))
+    qr = qr.resize((matriz.shape[1] * escala, matriz.shape[0] * escala), Image.NEAREST)
+    etiqueta.paste(qr, (margem, (altura - qr.height) // 2))
+
+    desenho = ImageDraw.Draw(etiqueta)
+    x = margem * 2 + qr.width
+    y = margem
+    tamanho_nome = altura // 9
+    largura_texto = max(8, (largura - x - margem) * 2 // tamanho_nome)
+    for linha in textwrap.wrap(str(item.get("nome") or ""), largura_texto)[:3]:
+        desenho.text((x, y), linha, fill=0, font=_fonte(tamanho_nome))
+        y += int(tamanho_nome * 1.2)
+    y += margem // 2
+    desenho.text((x, y), str(item.get("categoria") or ""), fill=0, font=_fonte(altura // 12))
+    desenho.text((x, altura - margem - altura // 11), str(item["codigo"]), fill=0, font=_fonte(altura // 11))
+    return etiqueta
+
+
+def _renderizar_png(argumentos):
+    """Renderiza uma etiqueta em PNG, usando/gravando o cache em disco (roda nos processos)"""
+    item, largura, altura = argumentos
+    caminho = os.path.join(PASTA_CACHE, _chave(item, largura, altura, "png") + ".png")
+    try:
+        with open(caminho, "rb") as arquivo:
+            return arquivo.read()
+    except OSError:
+        pass
+    buffer = io.BytesIO()
+    desenhar_etiqueta(item, largura, altura).save(buffer, format="PNG", optimize=False)
+    dados = buffer.getvalue()
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho)
+    return dados
+
+
+def renderizar_lote(itens, largura=551, altura=292, processos=None):
+    """Renderiza várias etiquetas em PNG; retorna a lista de bytes na ordem dos itens"""
+    argumentos = [(_item_simples(item), largura, altura) for item in itens]
+    if len(argumentos) < LOTE_MINIMO_PROCESSOS or processos == 1:
+        return [_renderizar_png(argumento) for argumento in argumentos]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_renderizar_png, argumentos, chunksize=32))
+
+
+def _item_simples(item):
+    """Só os campos usados na etiqueta (dicionário pequeno e serializável)"""
+    return {"codigo": str(item["codigo"]), "nome": item.get("nome"), "categoria": item.get("categoria")}
+
+
+def etiqueta_png(item, largura=551, altura=292):
+    """Bytes PNG de uma etiqueta"""
+    return _renderizar_png((_item_simples(item), largura, altura))
+
+
+def etiqueta_svg(item, largura=551, altura=292):
+    """Etiqueta vetorial em SVG (QR Code como um único path)"""
+    item = _item_simples(item)
+    matriz = matriz_qr(item["codigo"])
+    margem = altura // 12
+    escala = (altura - 2 * margem) / matriz.shape[0]
+    caminho = "".join(f"M{c},{l}h1v1h-1z" for l, c in zip(*np.nonzero(matriz)))
+    x = margem * 2 + matriz.shape[1] * escala
+    tamanho_nome = altura // 9
+
+    def texto(valor):
+        return (str(valor or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;"))
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura}" height="{altura}" viewBox="0 0 {largura} {altura}">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<path transform="translate({margem},{margem}) scale({escala:.4f})" d="{caminho}" fill="#000"/>'
+        f'<text x="{x:.1f}" y="{margem + tamanho_nome}" font-family="sans-serif" font-size="{tamanho_nome}">{texto(item["nome"])}</text>'
+        f'<text x="{x:.1f}" y="{margem + 2.5 * tamanho_nome}" font-family="sans-serif" font-size="{altura // 12}">{texto(item["categoria"])}</text>'
+        f'<text x="{x:.1f}" y="{altura - margem}" font-family="monospace" font-size="{altura // 11}">{texto(item["codigo"])}</text>'
+        f'</svg>'
+    )
+
+
+def folhas_pdf(itens, colunas=COLUNAS_FOLHA, linhas=LINHAS_FOLHA, processos=None):
+    """PDF A4 com várias etiquetas por página (bytes)"""
+    itens = list(itens)
+    largura_util = TAMANHO_FOLHA[0] - 2 * MARGEM_FOLHA
+    altura_util = TAMANHO_FOLHA[1] - 2 * MARGEM_FOLHA
+    largura, altura = largura_util // colunas, altura_util // linhas
+    pngs = renderizar_lote(itens, largura, altura, processos)
+
+    por_folha = colunas * linhas
+    folhas = []
+    for inicio in range(0, max(len(pngs), 1), por_folha):
+        folha = Image.new("L", TAMANHO_FOLHA, 255)
+        for posicao, dados in enumerate(pngs[inicio:inicio + por_folha]):
+            linha, coluna = divmod(posicao, colunas)
+            folha.paste(Image.open(io.BytesIO(dados)),
+                        (MARGEM_FOLHA + coluna * largura, MARGEM_FOLHA + linha * altura))
+        # 1 bit sem pontilhado: o PDF guarda a página comprimida sem perdas e o QR fica nítido
+        folhas.append(folha.convert("1", dither=Image.Dither.NONE))
+
+    buffer = io.BytesIO()
+    folhas[0].save(buffer, format="PDF", save_all=True, append_images=folhas[1:], resolution=DPI)
+    return buffer.getvalue()
+
+
+def pacote_png(itens, processos=None):
+    """Arquivo ZIP com uma etiqueta PNG por item"""
+    itens = list(itens)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as pacote:
+        for item, dados in zip(itens, renderizar_lote(itens, processos=processos)):
+            pacote.writestr(f"etiqueta_{item['codigo']}.png", dados)
+    return buffer.getvalue()
+
+
+def _ler_inventario(caminho):
+    import pandas as pd
+
+    df = pd.read_csv(caminho, dtype={"codigo": str})
+    return df.to_dict("records")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera etiquetas com QR Code a partir do inventário")
+    parser.add_argument("--csv", default="inventario.csv", help="arquivo do inventário")
+    parser.add_argument("--codigos", nargs="*", help="gera só estes códigos")
+    parser.add_argument("--categoria", help="gera só os itens desta categoria")
+    parser.add_argument("--formato", choices=["pdf", "png", "svg"], default="pdf")
+    parser.add_argument("--processos", type=int, default=None, help="processos de renderização")
+    parser.add_argument("--saida", required=True, help="arquivo de saída (.pdf, .zip ou .svg)")
+    args = parser.parse_args()
+
+    itens = _ler_inventario(args.csv)
+    if args.codigos:
+        codigos = set(args.codigos)
+        itens = [item for item in itens if item["codigo"] in codigos]
+    if args.categoria:
+        itens = [item for item in itens if item.get("categoria") == args.categoria]
+    if not itens:
+        parser.error("nenhum item encontrado com esses filtros")
+
+    if args.formato == "pdf":
+        dados = folhas_pdf(itens, processos=args.processos)
+    elif args.formato == "png":
+        dados = pacote_png(itens, processos=args.processos)
+    else:
+        if len(itens) > 1:
+            parser.error("o formato svg gera uma etiqueta por vez; use --codigos com um código")
+        dados = etiqueta_svg(itens[0]).encode("utf-8")
+
+    with open(args.saida, "wb") as arquivo:
+        arquivo.write(dados)
+    print(f"{len(itens)} etiqueta(s) gravada(s) em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
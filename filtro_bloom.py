@@ -0,0 +1,102 @@
+# Filtro de Bloom para os códigos cadastrados
+#
+# Responde "com certeza não cadastrado" sem tocar no CSV nem no Supabase.
+# Um "talvez cadastrado" ainda precisa ser confirmado na base (falso positivo
+# na taxa configurada). É gravado em disco junto com uma assinatura da fonte
+# para saber quando precisa ser reconstruído.
+import hashlib
+import json
+import math
+import os
+import threading
+
+TAXA_ERRO_PADRAO = 0.01
+CAPACIDADE_MINIMA = 1024
+
+
+class FiltroBloom:
+    """Conjunto probabilístico de códigos (sem falsos negativos)"""
+
+    def __init__(self, capacidade=CAPACIDADE_MINIMA, taxa_erro=TAXA_ERRO_PADRAO):
+        self.capacidade = max(int(capacidade), 1)
+        self.taxa_erro = taxa_erro
+        # Tamanho ótimo em bits e número de funções de hash
+        self.num_bits = max(8, math.ceil(-self.capacidade * math.log(taxa_erro) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacidade * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.quantidade = 0
+        self._lock = threading.Lock()
+
+    def _posicoes(self, codigo):
+        # Hash duplo (Kirsch-Mitzenmacher): h1 + i*h2 a partir de um único blake2b
+        digest = hashlib.blake2b(str(codigo).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def adicionar(self, codigo):
+        """Adiciona um código ao filtro"""
+        posicoes = self._posicoes(codigo)
+        with self._lock:
+            for pos in posicoes:
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.quantidade += 1
+
+    def __contains__(self, codigo):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._posicoes(codigo))
+
+    def __len__(self):
+        return self.quantidade
+
+    @property
+    def saturado(self):
+        """Indica se passou da capacidade (a taxa de falsos positivos já subiu)"""
+        return self.quantidade > self.capacidade
+
+    @classmethod
+    def construir(cls, codigos, taxa_erro=TAXA_ERRO_PADRAO):
+        """Cria um filtro com folga para crescer a partir de uma lista de códigos"""
+        codigos = list(codigos)
+        filtro = cls(max(CAPACIDADE_MINIMA, 2 * len(codigos)), taxa_erro)
+        for codigo in codigos:
+            filtro.adicionar(codigo)
+        return filtro
+
+    def salvar(self, caminho, assinatura=""):
+        """Grava o filtro de forma atômica (arquivo temporário + rename)"""
+        cabecalho = {
+            "capacidade": self.capacidade,
+            "taxa_erro": self.taxa_erro,
+            "quantidade": self.quantidade,
+            "assinatura": assinatura,
+        }
+        temporario = f"{caminho}.tmp"
+        with self._lock, open(temporario, "wb") as arquivo:
+            arquivo.write(json.dumps(cabecalho).encode("utf-8") + b"\n")
+            arquivo.write(self.bits)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê um filtro salvo; retorna (filtro, assinatura) ou (None, None)"""
+        try:
+            with open(caminho, "rb") as arquivo:
+                cabecalho = json.loads(arquivo.readline())
+                bits = arquivo.read()
+        except (OSError, ValueError):
+            return None, None
+        filtro = cls(cabecalho["capacidade"], cabecalho["taxa_erro"])
+        if len(bits) != len(filtro.bits):
+            return None, None
+        filtro.bits = bytearray(bits)
+        filtro.quantidade = cabecalho["quantidade"]
+        return filtro, cabecalho["assinatura"]
+
+
+def carregar_ou_construir(caminho, assinatura, obter_codigos):
+    """Usa o filtro salvo se a assinatura bater; senão reconstrói a partir da fonte"""
+    filtro, assinatura_salva = FiltroBloom.carregar(caminho)
+    if filtro is None or assinatura_salva != assinatura or filtro.saturado:
+        filtro = FiltroBloom.construir(obter_codigos())
+        filtro.salvar(caminho, assinatura)
+    return filtro
@@ -0,0 +1,82 @@
+# Especificações Vega-Lite dos gráficos do dashboard
+#
+# Os gráficos são montados como dicionários (chart.to_dict()) para que o
+# Streamlit possa guardá-los em cache pela versão dos dados; séries longas
+# são reduzidas com LTTB para um número fixo de pontos antes de serializar.
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# Pontos por série no histórico (o formato da curva é preservado pelo LTTB)
+MAX_PONTOS = 400
+
+
+def lttb(x, y, limite):
+    """Largest-Triangle-Three-Buckets: índices dos pontos que preservam o formato da série"""
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    # Baldes intermediários de tamanho igual (primeiro e último ponto ficam fixos)
+    limites = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Média do próximo balde (ou o último ponto)
+        if i + 2 < len(limites):
+            proximo = slice(limites[i + 1], limites[i + 2])
+            media_x, media_y = x[proximo].mean(), y[proximo].mean()
+        else:
+            media_x, media_y = x[-1], y[-1]
+        # Ponto do balde que forma o maior triângulo com o anterior e a média seguinte
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+
+def reduzir_serie(serie, limite=MAX_PONTOS, por_categoria=False):
+    """Aplica o LTTB à série (a cada categoria separadamente, se for o caso)"""
+    if por_categoria:
+        partes = [reduzir_serie(grupo, limite) for _, grupo in serie.groupby("categoria", sort=False)]
+        return pd.concat(partes, ignore_index=True) if partes else serie
+    if len(serie) <= limite:
+        return serie
+    x = serie["periodo"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return serie.iloc[lttb(x, serie["contagem"].to_numpy(), limite)].reset_index(drop=True)
+
+
+def spec_categorias(categorias):
+    """Gráfico de barras com a quantidade de itens por categoria"""
+    categoria_counts = pd.DataFrame(list(categorias.items()), columns=['categoria', 'contagem'])
+    chart = alt.Chart(categoria_counts).mark_bar().encode(
+        x=alt.X('categoria:N', title='Categoria', sort='-y'),
+        y=alt.Y('contagem:Q', title='Quantidade de Itens'),
+        color=alt.Color('categoria:N', legend=None)
+    ).properties(
+        height=300
+    )
+    return chart.to_dict()
+
+
+def spec_historico(serie, rotulo, granularidade, por_categoria=False):
+    """Gráfico de linha dos cadastros por período (já reduzido com LTTB)"""
+    serie = reduzir_serie(serie, por_categoria=por_categoria)
+    formato = "%Y-%m" if granularidade == "mes" else "%d/%m/%Y"
+    line_chart = alt.Chart(serie).mark_line(point=len(serie) <= 60).encode(
+        x=alt.X('periodo:T', title=rotulo, axis=alt.Axis(format=formato)),
+        y=alt.Y('contagem:Q', title='Itens Cadastrados'),
+        color=alt.Color('categoria:N', title='Categoria') if por_categoria else alt.value("#008000"),
+        tooltip=[alt.Tooltip('periodo:T', title=rotulo, format=formato), 'contagem'] + (['categoria'] if por_categoria else [])
+    ).properties(
+        height=300
+    )
+    return line_chart.to_dict()
@@ -0,0 +1,131 @@
+# Índice invertido para busca por nome, descrição e categoria
+#
+# Cada palavra (sem acentos, minúscula) aponta para os códigos que a contêm,
+# com peso maior para o nome. A busca aceita prefixos ("para" -> "parafuso")
+# e erros de digitação: palavras parecidas são achadas por trigramas. O
+# índice é montado uma vez a partir do inventário e recebe cada novo item em
+# adicionar(), sem reconstrução.
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+PESOS = {"nome": 3.0, "categoria": 1.5, "descricao": 1.0}
+
+# Limites que mantêm a busca rápida mesmo com vocabulário grande
+MAX_EXPANSOES_PREFIXO = 64
+MAX_CANDIDATOS_FUZZY = 16
+SIMILARIDADE_MINIMA = 0.4
+
+_SEPARADORES = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos"""
+    texto = unicodedata.normalize("NFKD", str(texto or "")).encode("ascii", "ignore").decode("ascii")
+    return texto.lower()
+
+
+def tokenizar(texto):
+    """Quebra o texto em palavras normalizadas"""
+    return [token for token in _SEPARADORES.split(normalizar(texto)) if token]
+
+
+def trigramas(token):
+    """Trigramas da palavra com bordas (" pa", "par", ..., "so ")"""
+    marcado = f" {token} "
+    return {marcado[i:i + 3] for i in range(len(marcado) - 2)}
+
+
+class IndiceBusca:
+    """Índice de palavras e trigramas com busca ranqueada por prefixo e aproximação"""
+
+    def __init__(self):
+        self._postagens = defaultdict(dict)   # palavra -> {codigo: peso}
+        self._trigramas = defaultdict(set)    # trigrama -> palavras
+        self._vocabulario = []                # palavras ordenadas (busca por prefixo)
+        self._lock = threading.RLock()
+        self.quantidade = 0
+
+    def adicionar(self, codigo, nome="", descricao="", categoria=""):
+        """Indexa um item"""
+        campos = {"nome": nome, "descricao": descricao, "categoria": categoria}
+        pesos = defaultdict(float)
+        for campo, texto in campos.items():
+            for token in tokenizar(texto):
+                pesos[token] += PESOS[campo]
+
+        with self._lock:
+            for token, peso in pesos.items():
+                postagem = self._postagens[token]
+                if not postagem:
+                    bisect.insort(self._vocabulario, token)
+                    for trigrama in trigramas(token):
+                        self._trigramas[trigrama].add(token)
+                postagem[codigo] = peso
+            self.quantidade += 1
+
+    @classmethod
+    def construir(cls, itens):
+        """Cria o índice a partir de dicionários com codigo, nome, descricao e categoria"""
+        indice = cls()
+        for item in itens:
+            indice.adicionar(item["codigo"], item.get("nome"), item.get("descricao"), item.get("categoria"))
+        return indice
+
+    def _expandir(self, token):
+        """Palavras do vocabulário que casam com o termo: {palavra: fator}"""
+        expansoes = {}
+        # Prefixo: fator 1 para a palavra exata, um pouco menos para completações
+        inicio = bisect.bisect_left(self._vocabulario, token)
+        for palavra in self._vocabulario[inicio:inicio + MAX_EXPANSOES_PREFIXO]:
+            if not palavra.startswith(token):
+                break
+            expansoes[palavra] = 1.0 if palavra == token else 0.8
+
+        # Aproximação: palavras que compartilham trigramas suficientes (coeficiente de Dice)
+        if len(token) >= 3:
+            alvo = trigramas(token)
+            contagem = defaultdict(int)
+            for trigrama in alvo:
+                for palavra in self._trigramas.get(trigrama, ()):
+                    contagem[palavra] += 1
+            parecidas = heapq.nlargest(MAX_CANDIDATOS_FUZZY, contagem.items(), key=lambda par: par[1])
+            for palavra, comuns in parecidas:
+                similaridade = 2 * comuns / (len(alvo) + len(palavra) + 2)
+                if similaridade >= SIMILARIDADE_MINIMA and palavra not in expansoes:
+                    expansoes[palavra] = 0.6 * similaridade
+        return expansoes
+
+    def buscar(self, consulta, limite=20):
+        """Retorna [(codigo, pontuação)] dos itens que casam com todos os termos"""
+        termos = tokenizar(consulta)
+        if not termos:
+            return []
+
+        with self._lock:
+            expansoes = [self._expandir(termo) for termo in termos]
+            # Termo mais raro primeiro: os demais só são conferidos nos candidatos dele
+            expansoes.sort(key=lambda expansao: sum(len(self._postagens[palavra]) for palavra in expansao))
+
+            pontuacoes = {}
+            for palavra, fator in expansoes[0].items():
+                for codigo, peso in self._postagens[palavra].items():
+                    pontos = peso * fator
+                    if pontos > pontuacoes.get(codigo, 0.0):
+                        pontuacoes[codigo] = pontos
+
+            for expansao in expansoes[1:]:
+                postagens = [(self._postagens[palavra], fator) for palavra, fator in expansao.items()]
+                restantes = {}
+                for codigo, pontos in pontuacoes.items():
+                    melhor = max((postagem[codigo] * fator for postagem, fator in postagens if codigo in postagem), default=0.0)
+                    if melhor:
+                        restantes[codigo] = pontos + melhor
+                pontuacoes = restantes
+                if not pontuacoes:
+                    return []
+
+        return heapq.nlargest(limite, pontuacoes.items(), key=lambda par: par[1])
@@ -0,0 +1,262 @@
+# Armazenamento do inventário em CSV, compartilhado pela interface e pela API
+#
+# O inventario.csv guarda os cadastros; entradas e saídas vão para o livro de
+# movimentações. Filtro de Bloom, snapshot em memória (indexado por código),
+# índice de busca e agregados são derivados do CSV: montados uma vez por
+# versão do arquivo e atualizados item a item pelos cadastros deste processo.
+import os
+import threading
+
+import pandas as pd
+
+from agregados import CuboCadastros, periodo_de
+from filtro_bloom import carregar_ou_construir
+from indice_busca import IndiceBusca
+from movimentos import LivroMovimentos
+
+CAMINHO_CSV = os.environ.get("INVENTARIO_CSV", "inventario.csv")
+CAMINHO_FILTRO = os.environ.get("INVENTARIO_FILTRO", "inventario.bloom")
+CAMINHO_MOVIMENTOS = os.environ.get("INVENTARIO_MOVIMENTOS", "movimentos.csv")
+
+COLUNAS = ["codigo", "nome", "descricao", "categoria", "quantidade", "data_cadastro"]
+
+# Colunas da tabela do dashboard (também as que aceitam ordenação)
+COLUNAS_ORDENACAO = ["codigo", "nome", "categoria", "quantidade", "data_cadastro"]
+
+# Como cada estrutura derivada recebe um item recém-cadastrado (as demais são remontadas)
+ATUALIZADORES = {
+    "filtro": lambda filtro, item: filtro.adicionar(item["codigo"]),
+    "indice_busca": lambda indice, item: indice.adicionar(item["codigo"], item["nome"], item["descricao"], item["categoria"]),
+    "cubo_cadastros": lambda cubo, item: cubo.adicionar(item["data_cadastro"], item["categoria"]),
+}
+
+
+def _nativo(valor):
+    """Converte escalares do numpy para os tipos do Python"""
+    return valor.item() if hasattr(valor, "item") else valor
+
+
+class InventarioCSV:
+    """Inventário em CSV com livro de movimentações e estruturas derivadas em memória"""
+
+    def __init__(self, caminho=CAMINHO_CSV, caminho_filtro=CAMINHO_FILTRO, caminho_movimentos=CAMINHO_MOVIMENTOS):
+        self.caminho = caminho
+        self.caminho_filtro = caminho_filtro
+        self.livro = LivroMovimentos(caminho_movimentos)
+        self._estruturas = {}  # nome -> (assinatura do CSV, estrutura)
+        self._lock = threading.RLock()
+        self._lock_escrita = threading.Lock()
+
+    def _ler_csv(self):
+        """Lê o CSV (criando-o vazio se não existir), com a quantidade cadastrada"""
+        if os.path.exists(self.caminho):
+            return pd.read_csv(self.caminho, dtype={"codigo": str})
+        df = pd.DataFrame(columns=COLUNAS)
+        df.to_csv(self.caminho, index=False)
+        return df
+
+    def assinatura(self):
+        """Identifica a versão atual do CSV (tamanho e data de modificação)"""
+        if not os.path.exists(self.caminho):
+            return ""
+        info = os.stat(self.caminho)
+        return f"{info.st_size}-{info.st_mtime_ns}"
+
+    @property
+    def versao(self):
+        """Versão atual dos dados cadastrados (muda a cada gravação do CSV)"""
+        return self.assinatura()
+
+    # Estruturas derivadas
+
+    def _construir(self, nome, assinatura):
+        if nome == "filtro":
+            return carregar_ou_construir(self.caminho_filtro, assinatura, lambda: self._ler_csv()["codigo"])
+        if nome == "snapshot":
+            # Indexado por código para buscas pontuais por hash (sem varrer a tabela)
+            return self._ler_csv().set_index("codigo", drop=False).rename_axis(None)
+        if nome == "registros":
+            # Colunas como arrays e posição de cada código: consulta pontual sem o custo do pandas
+            snapshot = self.snapshot()
+            colunas = {coluna: snapshot[coluna].to_numpy() for coluna in snapshot.columns}
+            codigos = colunas["codigo"]
+            # Percorrido de trás para frente: em códigos repetidos vale a primeira linha
+            posicoes = {codigos[posicao]: posicao for posicao in range(len(codigos) - 1, -1, -1)}
+            return colunas, posicoes
+        if nome == "indice_busca":
+            return IndiceBusca.construir(self.snapshot().to_dict("records"))
+        if nome == "cubo_cadastros":
+            snapshot = self.snapshot()
+            return CuboCadastros.construir(snapshot["data_cadastro"], snapshot["categoria"])
+        raise KeyError(nome)
+
+    def _estrutura(self, nome):
+        """Retorna a estrutura derivada, montando-a só se ainda não existe ou o CSV mudou por fora"""
+        assinatura = self.assinatura()
+        with self._lock:
+            assinatura_atual, estrutura = self._estruturas.get(nome, (None, None))
+            if assinatura_atual != assinatura:
+                estrutura = self._construir(nome, assinatura)
+                self._estruturas[nome] = (assinatura, estrutura)
+        return estrutura
+
+    def _atualizar_estruturas(self, item, assinatura_anterior):
+        """Acrescenta um item recém-cadastrado às estruturas derivadas, sem reconstruí-las"""
+        assinatura = self.assinatura()
+        with self._lock:
+            for nome, (assinatura_atual, estrutura) in list(self._estruturas.items()):
+                if assinatura_atual == assinatura_anterior and nome in ATUALIZADORES:
+                    ATUALIZADORES[nome](estrutura, item)
+                    self._estruturas[nome] = (assinatura, estrutura)
+                    if nome == "filtro":
+                        estrutura.salvar(self.caminho_filtro, assinatura)
+
+    def filtro(self):
+        """Filtro de Bloom dos códigos cadastrados"""
+        return self._estrutura("filtro")
+
+    def snapshot(self):
+        """Inventário em memória indexado por código (somente leitura, sem movimentações)"""
+        return self._estrutura("snapshot")
+
+    def aplicar_movimentos(self, df):
+        """Soma à quantidade cadastrada o saldo das movimentações de cada código"""
+        saldos = self.livro.saldos()
+        if saldos and len(df) > 0:
+            df = df.copy()
+            df["quantidade"] = df["quantidade"] + df["codigo"].map(saldos).fillna(0).astype(int)
+        return df
+
+    # Leitura
+
+    def load_data(self):
+        """Todo o inventário, com as quantidades já movimentadas"""
+        return self.aplicar_movimentos(self._ler_csv())
+
+    def buscar_itens(self, codigos, ler_remoto=True):
+        """Busca vários códigos de uma vez; retorna ({codigo: item}, códigos não encontrados)
+
+        ler_remoto existe só para manter a assinatura da réplica do Supabase.
+        """
+        codigos = {str(codigo) for codigo in codigos}
+        filtro = self.filtro()
+        candidatos = [codigo for codigo in codigos if codigo in filtro]
+
+        encontrados = {}
+        if candidatos:
+            colunas, posicoes = self._estrutura("registros")
+            # Um código só: lê o saldo dele; vários: uma leitura de todos os saldos
+            saldos = self.livro.saldos() if len(candidatos) > 1 else {candidatos[0]: self.livro.saldo(candidatos[0])}
+            for codigo in candidatos:
+                posicao = posicoes.get(codigo)
+                if posicao is None:
+                    continue
+                item = {coluna: _nativo(valores[posicao]) for coluna, valores in colunas.items()}
+                item["quantidade"] += saldos.get(codigo, 0)
+                encontrados[codigo] = item
+
+        return encontrados, codigos - encontrados.keys()
+
+    def buscar_item(self, codigo, ler_remoto=True):
+        """Busca um item pelo código"""
+        # Código com certeza não cadastrado: responde sem consultar o snapshot
+        codigo = str(codigo)
+        if codigo not in self.filtro():
+            return None
+        encontrados, _ = self.buscar_itens([codigo])
+        return encontrados.get(codigo)
+
+    def pagina_itens(self, categoria=None, prefixo_nome="", data_inicio=None, data_fim=None,
+                     ordenar_por="data_cadastro", decrescente=True, limite=50, offset=0):
+        """Retorna (linhas da página, total filtrado)
+
+        data_inicio/data_fim são strings "AAAA-MM-DD" (data_fim inclusiva).
+        """
+        if ordenar_por not in COLUNAS_ORDENACAO:
+            raise ValueError(f"Coluna de ordenação inválida: {ordenar_por}")
+
+        df = self.snapshot()
+        mascara = pd.Series(True, index=df.index)
+        if categoria:
+            mascara &= df["categoria"] == categoria
+        if prefixo_nome:
+            mascara &= df["nome"].str.lower().str.startswith(prefixo_nome.lower(), na=False)
+        # As datas são texto "AAAA-MM-DD HH:MM:SS": comparar strings dispensa o to_datetime
+        if data_inicio:
+            mascara &= df["data_cadastro"] >= data_inicio
+        if data_fim:
+            mascara &= df["data_cadastro"] < data_fim + "\uffff"
+
+        filtrado = df.loc[mascara, COLUNAS_ORDENACAO]
+        if ordenar_por == "quantidade":
+            filtrado = self.aplicar_movimentos(filtrado)
+        pagina = filtrado.sort_values([ordenar_por, "codigo"], ascending=not decrescente).iloc[offset:offset + limite]
+        if ordenar_por != "quantidade":
+            pagina = self.aplicar_movimentos(pagina)
+        return pagina.to_dict("records"), len(filtrado)
+
+    def buscar_texto(self, consulta, limite=20):
+        """Busca itens por nome, descrição e categoria (prefixo e aproximação), do mais relevante ao menos"""
+        resultados = self._estrutura("indice_busca").buscar(consulta, limite)
+        if not resultados:
+            return []
+
+        df = self.snapshot()
+        posicoes = df.index.get_indexer_for([codigo for codigo, _ in resultados])
+        linhas = self.aplicar_movimentos(df.iloc[posicoes[posicoes >= 0]])
+        por_codigo = {item["codigo"]: item for item in linhas.to_dict("records")}
+        return [por_codigo[codigo] for codigo, _ in resultados if codigo in por_codigo]
+
+    def consultar_agregados(self, granularidade, inicio=None, fim=None, categorias=None):
+        """Retorna [(periodo, categoria, contagem)] dos cadastros agregados no período"""
+        return self._estrutura("cubo_cadastros").linhas(granularidade, inicio, fim, categorias)
+
+    def get_stats(self):
+        """Total de itens, cadastros de hoje e itens por categoria"""
+        total_items = len(self.snapshot())
+
+        # Cadastros de hoje e por categoria, direto dos agregados (sem varrer as datas)
+        hoje = periodo_de("dia", pd.Timestamp.now())
+        cadastros_hoje = sum(contagem for _, _, contagem in self.consultar_agregados("dia", hoje, hoje))
+
+        categorias = {}
+        for _, categoria, contagem in self.consultar_agregados("mes"):
+            categorias[categoria] = categorias.get(categoria, 0) + contagem
+        categorias = dict(sorted(categorias.items(), key=lambda par: par[1], reverse=True))
+
+        return total_items, cadastros_hoje, categorias
+
+    # Escrita
+
+    def add_item(self, nova_linha):
+        """Acrescenta um item ao CSV e às estruturas derivadas; retorna o item gravado"""
+        with self._lock_escrita:
+            self.filtro()
+            assinatura_anterior = self.assinatura()
+            df = pd.concat([self._ler_csv(), pd.DataFrame([nova_linha])], ignore_index=True)
+            df.to_csv(self.caminho, index=False)
+            self._atualizar_estruturas(nova_linha, assinatura_anterior)
+        return nova_linha
+
+    def registrar_movimento(self, codigo, delta, operador=""):
+        """Registra uma entrada (delta > 0) ou saída (delta < 0) e retorna a nova quantidade"""
+        item = self.buscar_item(codigo)
+        if item is None:
+            raise ValueError("Item não cadastrado")
+        # Quantidade cadastrada sem as movimentações, para o livro validar o saldo
+        quantidade_base = int(item["quantidade"]) - self.livro.saldo(codigo)
+        saldo = self.livro.registrar(codigo, delta, operador, quantidade_base=quantidade_base)
+        return quantidade_base + saldo
+
+
+_inventario = None
+_inventario_lock = threading.Lock()
+
+
+def get_inventario():
+    """Retorna o inventário em CSV compartilhado pelo processo"""
+    global _inventario
+    with _inventario_lock:
+        if _inventario is None:
+            _inventario = InventarioCSV()
+    return _inventario
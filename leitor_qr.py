@@ -0,0 +1,72 @@
+# Leitura de QR Code em imagens (câmera ou upload)
+#
+# Usado pela interface Streamlit e pela API: corrige a orientação pelo EXIF e
+# tenta decodificar em 0, 90, 180 e 270 graus.
+import numpy as np
+from PIL import Image, ExifTags
+from pyzbar.pyzbar import decode
+
+
+def scan_qr_code(image):
+    """Escaneia QR Code com detecção de orientação"""
+    # Verificar e corrigir orientação da imagem
+    if isinstance(image, Image.Image):
+        try:
+            # Tentar obter informações de orientação
+            for orientation in ExifTags.TAGS.keys():
+                if ExifTags.TAGS[orientation] == 'Orientation':
+                    break
+
+            exif = image._getexif()
+            if exif is not None:
+                exif_orientation = exif.get(orientation)
+
+                # Corrigir orientação baseado no valor EXIF
+                if exif_orientation == 2:
+                    image = image.transpose(Image.FLIP_LEFT_RIGHT)
+                elif exif_orientation == 3:
+                    image = image.transpose(Image.ROTATE_180)
+                elif exif_orientation == 4:
+                    image = image.transpose(Image.FLIP_TOP_BOTTOM)
+                elif exif_orientation == 5:
+                    image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_90)
+                elif exif_orientation == 6:
+                    image = image.transpose(Image.ROTATE_270)
+                elif exif_orientation == 7:
+                    image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_270)
+                elif exif_orientation == 8:
+                    image = image.transpose(Image.ROTATE_90)
+        except (AttributeError, KeyError, IndexError):
+            # Se não conseguir obter/processar EXIF, continuar assim mesmo
+            pass
+
+        # Converter para formato OpenCV
+        img = np.array(image.convert('RGB'))
+        img = img[:, :, ::-1].copy()  # Converter RGB para BGR
+    else:
+        return None
+
+    # Tentar decodificar normalmente
+    decoded_objects = decode(img)
+
+    # Se não detectar nada, tentar com rotações adicionais
+    if not decoded_objects:
+        # Testar 90 graus
+        img_90 = np.rot90(img)
+        decoded_objects = decode(img_90)
+
+        # Testar 180 graus
+        if not decoded_objects:
+            img_180 = np.rot90(img_90)
+            decoded_objects = decode(img_180)
+
+            # Testar 270 graus
+            if not decoded_objects:
+                img_270 = np.rot90(img_180)
+                decoded_objects = decode(img_270)
+
+    if decoded_objects:
+        # Retornar o primeiro QR code encontrado
+        return decoded_objects[0].data.decode('utf-8')
+    else:
+        return None
@@ -0,0 +1,74 @@
+# Livro de movimentações de estoque para o armazenamento em CSV
+#
+# Cada entrada/saída é uma linha acrescentada ao final de movimentos.csv
+# (codigo, delta, data, operador); o inventario.csv não é regravado. O saldo
+# por código é mantido em memória e atualizado lendo apenas os bytes novos do
+# arquivo, então cada evento custa o mesmo independente do tamanho do livro,
+# inclusive quando outro processo escreveu no arquivo.
+import csv
+import io
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+CAMPOS = ["codigo", "delta", "data", "operador"]
+
+
+class LivroMovimentos:
+    """Livro somente-inserção com saldo incremental por código"""
+
+    def __init__(self, caminho="movimentos.csv"):
+        self.caminho = caminho
+        self._saldos = defaultdict(int)
+        self._posicao = 0
+        self._lock = threading.Lock()
+        if not os.path.exists(caminho):
+            with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+                csv.writer(arquivo).writerow(CAMPOS)
+
+    def _ler_novos(self):
+        """Aplica ao saldo as linhas acrescentadas desde a última leitura"""
+        with open(self.caminho, "rb") as arquivo:
+            arquivo.seek(self._posicao)
+            novos = arquivo.read()
+        # Só consome até a última quebra de linha (uma escrita pode estar em andamento)
+        fim = novos.rfind(b"\n") + 1
+        if fim == 0:
+            return
+        linhas = csv.reader(io.StringIO(novos[:fim].decode("utf-8")))
+        if self._posicao == 0:
+            next(linhas, None)  # cabeçalho
+        for codigo, delta, *_ in linhas:
+            self._saldos[codigo] += int(delta)
+        self._posicao += fim
+
+    def saldos(self):
+        """Retorna {codigo: soma dos deltas} já com as movimentações mais recentes"""
+        with self._lock:
+            self._ler_novos()
+            return dict(self._saldos)
+
+    def saldo(self, codigo):
+        """Soma dos deltas de um código"""
+        with self._lock:
+            self._ler_novos()
+            return self._saldos.get(str(codigo), 0)
+
+    def registrar(self, codigo, delta, operador="", quantidade_base=None):
+        """Acrescenta uma movimentação ao livro e retorna o novo saldo do código
+
+        Com quantidade_base, recusa (ValueError) uma saída que deixaria o estoque negativo.
+        """
+        codigo = str(codigo)
+        linha = io.StringIO()
+        csv.writer(linha).writerow([codigo, int(delta), datetime.now().strftime("%Y-%m-%d %H:%M:%S"), operador])
+        with self._lock:
+            self._ler_novos()
+            if quantidade_base is not None and quantidade_base + self._saldos.get(codigo, 0) + delta < 0:
+                raise ValueError("Estoque insuficiente para esta saída")
+            # Uma única escrita em modo append: a linha não se mistura com a de outro processo
+            with open(self.caminho, "a", newline="", encoding="utf-8") as arquivo:
+                arquivo.write(linha.getvalue())
+            self._ler_novos()
+            return self._saldos.get(codigo, 0)
@@ -0,0 +1,484 @@
+# Réplica local (SQLite) da tabela de inventário do Supabase
+#
+# Buscas, estatísticas e o dashboard são servidos localmente. A réplica puxa
+# apenas as linhas novas (data_cadastro >= última vista) em intervalos ou sob
+# demanda, e continua funcionando sem rede: cadastros feitos offline ficam
+# numa fila e são enviados na próxima sincronização bem-sucedida.
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+import httpx
+
+from filtro_bloom import FiltroBloom, carregar_ou_construir
+from indice_busca import IndiceBusca
+from supabase_conexao import (
+    COLUNAS,
+    executar,
+    add_item_async,
+    buscar_item_async,
+    buscar_itens_async,
+    buscar_texto_async,
+    registrar_movimento_async,
+    selecionar_tudo_async,
+)
+
+CAMINHO_REPLICA = os.environ.get("INVENTARIO_REPLICA", "inventario_replica.db")
+INTERVALO_SINCRONIZACAO = int(os.environ.get("INVENTARIO_SYNC_SEGUNDOS", "30"))
+
+# Limite de parâmetros por consulta no SQLite
+PARAMETROS_POR_CONSULTA = 900
+
+# Colunas aceitas para ordenar a tabela paginada do dashboard
+COLUNAS_ORDENACAO = ["codigo", "nome", "categoria", "quantidade", "data_cadastro"]
+
+
+def _mensagem_erro(erro):
+    """Extrai a mensagem de erro retornada pelo PostgREST"""
+    try:
+        return erro.response.json().get("message", str(erro))
+    except ValueError:
+        return str(erro)
+
+
+# Períodos inteiros (desde 1970-01-01) calculados no SQLite, iguais aos de agregados.periodos
+def _sql_periodos(linha):
+    dia = f"CAST(julianday(substr({linha}.data_cadastro, 1, 10)) - 2440587.5 AS INTEGER)"
+    mes = (f"((CAST(substr({linha}.data_cadastro, 1, 4) AS INTEGER) - 1970) * 12"
+           f" + CAST(substr({linha}.data_cadastro, 6, 2) AS INTEGER) - 1)")
+    return {"dia": dia, "semana": f"(({dia} + 3) / 7)", "mes": mes}
+
+
+def _sql_contar(linha, sinal):
+    """Comandos que somam (sinal=1) ou subtraem (sinal=-1) uma linha dos agregados"""
+    categoria = f"COALESCE({linha}.categoria, 'Outros')"
+    return "".join(
+        f"INSERT INTO agregados (granularidade, periodo, categoria, contagem) "
+        f"VALUES ('{granularidade}', {expressao}, {categoria}, {sinal}) "
+        f"ON CONFLICT (granularidade, periodo, categoria) DO UPDATE SET contagem = contagem + ({sinal});"
+        for granularidade, expressao in _sql_periodos(linha).items()
+    )
+
+
+class ReplicaLocal:
+    """Cópia local do inventário com sincronização incremental"""
+
+    def __init__(self, caminho=CAMINHO_REPLICA, intervalo=INTERVALO_SINCRONIZACAO):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.online = True
+        self.ultima_sincronizacao = None
+        # Muda a cada gravação de linhas: chave dos caches de gráficos
+        self.versao = 0
+        self._lock = threading.RLock()
+        self._parar = threading.Event()
+        self._thread = None
+        # Índice de texto local, montado só se for preciso buscar sem rede
+        self._indice_busca = None
+
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # O REPLACE de uma linha existente dispara o gatilho de exclusão (mantém os agregados exatos)
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS inventario (
+                codigo TEXT PRIMARY KEY,
+                nome TEXT,
+                descricao TEXT,
+                categoria TEXT,
+                quantidade INTEGER,
+                data_cadastro TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_inventario_data ON inventario (data_cadastro);
+            CREATE INDEX IF NOT EXISTS idx_inventario_categoria ON inventario (categoria, data_cadastro);
+            CREATE INDEX IF NOT EXISTS idx_inventario_nome ON inventario (nome COLLATE NOCASE);
+            CREATE TABLE IF NOT EXISTS meta (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+            CREATE TABLE IF NOT EXISTS movimentos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                codigo TEXT NOT NULL,
+                delta INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                operador TEXT,
+                enviado INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_movimentos_enviado ON movimentos (enviado);
+            CREATE TABLE IF NOT EXISTS agregados (
+                granularidade TEXT NOT NULL,
+                periodo INTEGER NOT NULL,
+                categoria TEXT NOT NULL,
+                contagem INTEGER NOT NULL,
+                PRIMARY KEY (granularidade, periodo, categoria)
+            );
+            CREATE TABLE IF NOT EXISTS pendentes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                linha TEXT NOT NULL
+            );
+        """)
+
+        self._criar_agregados()
+
+        # Filtro de Bloom dos códigos: descarta códigos novos sem SQLite nem rede
+        self.caminho_filtro = f"{caminho}.bloom"
+        self.filtro = carregar_ou_construir(self.caminho_filtro, self._assinatura(), self._codigos)
+
+    def _criar_agregados(self):
+        """Cria os gatilhos que mantêm os agregados por período e preenche os que faltarem"""
+        self._conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS agregados_inclusao AFTER INSERT ON inventario
+            WHEN NEW.data_cadastro IS NOT NULL BEGIN {_sql_contar("NEW", 1)} END;
+            CREATE TRIGGER IF NOT EXISTS agregados_exclusao AFTER DELETE ON inventario
+            WHEN OLD.data_cadastro IS NOT NULL BEGIN {_sql_contar("OLD", -1)} END;
+            CREATE TRIGGER IF NOT EXISTS agregados_alteracao AFTER UPDATE OF data_cadastro, categoria ON inventario
+            BEGIN {_sql_contar("OLD", -1)} {_sql_contar("NEW", 1)} END;
+        """)
+        vazio = self._conn.execute("SELECT COUNT(*) FROM agregados").fetchone()[0] == 0
+        if vazio:
+            for granularidade, expressao in _sql_periodos("inventario").items():
+                self._conn.execute(
+                    f"INSERT INTO agregados (granularidade, periodo, categoria, contagem) "
+                    f"SELECT '{granularidade}', {expressao}, COALESCE(categoria, 'Outros'), COUNT(*) "
+                    f"FROM inventario WHERE data_cadastro IS NOT NULL GROUP BY 1, 2, 3"
+                )
+
+    # Leitura local
+    def buscar_item(self, codigo, ler_remoto=True):
+        """Busca um item na réplica; se não achar e estiver online, consulta o Supabase"""
+        # Com certeza não cadastrado (até a última sincronização): nenhuma consulta
+        if codigo not in self.filtro:
+            return None
+        with self._lock:
+            linha = self._conn.execute("SELECT * FROM inventario WHERE codigo = ?", (codigo,)).fetchone()
+        if linha is not None:
+            return dict(linha)
+        if not (ler_remoto and self.online):
+            return None
+
+        # Filtro disse "talvez" mas a réplica não tem a linha: confirma no Supabase
+        try:
+            item = executar(buscar_item_async(codigo))
+        except httpx.HTTPError:
+            self.online = False
+            return None
+        if item is not None:
+            self._gravar([item])
+            self._salvar_filtro()
+        return item
+
+    def buscar_itens(self, codigos, ler_remoto=True):
+        """Busca vários códigos de uma vez; retorna ({codigo: item}, códigos não encontrados)"""
+        codigos = {str(codigo) for codigo in codigos}
+        candidatos = [codigo for codigo in codigos if codigo in self.filtro]
+
+        encontrados = {}
+        with self._lock:
+            for i in range(0, len(candidatos), PARAMETROS_POR_CONSULTA):
+                lote = candidatos[i:i + PARAMETROS_POR_CONSULTA]
+                consulta = f"SELECT * FROM inventario WHERE codigo IN ({', '.join('?' * len(lote))})"
+                encontrados.update((linha["codigo"], dict(linha)) for linha in self._conn.execute(consulta, lote))
+
+        # Positivos do filtro que a réplica não tem: uma única ida ao Supabase
+        restantes = [codigo for codigo in candidatos if codigo not in encontrados]
+        if restantes and ler_remoto and self.online:
+            try:
+                remotos = executar(buscar_itens_async(restantes))
+            except httpx.HTTPError:
+                self.online = False
+                remotos = {}
+            if remotos:
+                self._gravar(remotos.values())
+                self._salvar_filtro()
+                encontrados.update(remotos)
+
+        return encontrados, codigos - encontrados.keys()
+
+    def buscar_texto(self, consulta, limite=20):
+        """Busca por nome/descrição/categoria: RPC no Supabase, ou índice local sem rede"""
+        if self.online:
+            try:
+                return executar(buscar_texto_async(consulta, limite))
+            except httpx.HTTPError:
+                self.online = False
+
+        with self._lock:
+            if self._indice_busca is None:
+                self._indice_busca = IndiceBusca.construir(self.load_data())
+        resultados = self._indice_busca.buscar(consulta, limite)
+        encontrados, _ = self.buscar_itens((codigo for codigo, _ in resultados), ler_remoto=False)
+        return [encontrados[codigo] for codigo, _ in resultados if codigo in encontrados]
+
+    def load_data(self):
+        """Retorna todas as linhas da réplica"""
+        with self._lock:
+            return [dict(linha) for linha in self._conn.execute("SELECT * FROM inventario ORDER BY codigo")]
+
+    def pagina_itens(self, categoria=None, prefixo_nome="", data_inicio=None, data_fim=None,
+                     ordenar_por="data_cadastro", decrescente=True, limite=50, offset=0):
+        """Retorna (linhas da página, total filtrado) com filtro e ordenação feitos no SQLite
+
+        data_inicio/data_fim são strings "AAAA-MM-DD" (data_fim inclusiva).
+        """
+        if ordenar_por not in COLUNAS_ORDENACAO:
+            raise ValueError(f"Coluna de ordenação inválida: {ordenar_por}")
+
+        condicoes, parametros = [], []
+        if categoria:
+            condicoes.append("categoria = ?")
+            parametros.append(categoria)
+        if prefixo_nome:
+            prefixo = prefixo_nome.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            condicoes.append("nome LIKE ? ESCAPE '\\'")
+            parametros.append(prefixo + "%")
+        if data_inicio:
+            condicoes.append("data_cadastro >= ?")
+            parametros.append(data_inicio)
+        if data_fim:
+            # Fim inclusivo: qualquer horário do dia data_fim
+            condicoes.append("data_cadastro < ?")
+            parametros.append(data_fim + "\uffff")
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        ordem = "DESC" if decrescente else "ASC"
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM inventario {where}", parametros).fetchone()[0]
+            linhas = self._conn.execute(
+                f"SELECT codigo, nome, categoria, quantidade, data_cadastro FROM inventario {where} "
+                f"ORDER BY {ordenar_por} {ordem}, codigo {ordem} LIMIT ? OFFSET ?",
+                parametros + [limite, offset],
+            ).fetchall()
+        return [dict(linha) for linha in linhas], total
+
+    def consultar_agregados(self, granularidade, inicio=None, fim=None, categorias=None):
+        """Retorna [(periodo, categoria, contagem)] dos cadastros agregados no período"""
+        condicoes, parametros = ["granularidade = ?", "contagem > 0"], [granularidade]
+        if inicio is not None:
+            condicoes.append("periodo >= ?")
+            parametros.append(inicio)
+        if fim is not None:
+            condicoes.append("periodo <= ?")
+            parametros.append(fim)
+        if categorias:
+            condicoes.append(f"categoria IN ({', '.join('?' * len(categorias))})")
+            parametros.extend(categorias)
+        with self._lock:
+            return [tuple(linha) for linha in self._conn.execute(
+                f"SELECT periodo, categoria, contagem FROM agregados WHERE {' AND '.join(condicoes)} ORDER BY periodo",
+                parametros,
+            )]
+
+    def get_stats(self):
+        """Obtém total de itens, cadastros de hoje e contagem por categoria"""
+        with self._lock:
+            total_items = self._conn.execute("SELECT COUNT(*) FROM inventario").fetchone()[0]
+            cadastros_hoje = self._conn.execute(
+                "SELECT COALESCE(SUM(contagem), 0) FROM agregados WHERE granularidade = 'dia' AND periodo = ?",
+                ((datetime.now().date() - date(1970, 1, 1)).days,),
+            ).fetchone()[0]
+            categorias = dict(self._conn.execute(
+                "SELECT categoria, SUM(contagem) AS n FROM agregados WHERE granularidade = 'mes' "
+                "GROUP BY categoria HAVING n > 0 ORDER BY n DESC"
+            ).fetchall())
+        return total_items, cadastros_hoje, categorias
+
+    def pendentes(self):
+        """Quantidade de cadastros e movimentações aguardando envio ao Supabase"""
+        with self._lock:
+            cadastros = self._conn.execute("SELECT COUNT(*) FROM pendentes").fetchone()[0]
+            movimentos = self._conn.execute("SELECT COUNT(*) FROM movimentos WHERE enviado = 0").fetchone()[0]
+        return cadastros + movimentos
+
+    # Escrita
+    def add_item(self, nova_linha):
+        """Grava o item no Supabase e na réplica; sem rede, enfileira o envio"""
+        try:
+            item = executar(add_item_async(nova_linha))
+            self.online = True
+        except httpx.TransportError:
+            self.online = False
+            with self._lock:
+                self._conn.execute("INSERT INTO pendentes (linha) VALUES (?)", (json.dumps(nova_linha),))
+            item = nova_linha
+        if item is not None:
+            self._gravar([item])
+            self._salvar_filtro()
+        return item
+
+    def registrar_movimento(self, codigo, delta, operador=""):
+        """Registra uma entrada/saída e retorna a nova quantidade
+
+        Online, o incremento é feito no Supabase (RPC registrar_movimento) e a
+        réplica recebe a quantidade resultante; sem rede, a réplica aplica o
+        delta com um único UPDATE e o evento fica pendente de envio.
+        """
+        data = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            quantidade = executar(registrar_movimento_async(codigo, delta, operador))
+            self.online = True
+        except httpx.TransportError:
+            self.online = False
+            quantidade = None
+        except httpx.HTTPStatusError as erro:
+            raise ValueError(_mensagem_erro(erro)) from erro
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            if quantidade is None:
+                cursor = self._conn.execute(
+                    "UPDATE inventario SET quantidade = quantidade + ? WHERE codigo = ? AND quantidade + ? >= 0",
+                    (delta, codigo, delta),
+                )
+                if cursor.rowcount == 0:
+                    self._conn.execute("ROLLBACK")
+                    raise ValueError("Item não cadastrado ou estoque insuficiente")
+            else:
+                self._conn.execute("UPDATE inventario SET quantidade = ? WHERE codigo = ?", (quantidade, codigo))
+            self._conn.execute(
+                "INSERT INTO movimentos (codigo, delta, data, operador, enviado) VALUES (?, ?, ?, ?, ?)",
+                (codigo, delta, data, operador, int(quantidade is not None)),
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.execute("SELECT quantidade FROM inventario WHERE codigo = ?", (codigo,)).fetchone()[0]
+
+    def _codigos(self):
+        with self._lock:
+            return [linha[0] for linha in self._conn.execute("SELECT codigo FROM inventario")]
+
+    def _assinatura(self):
+        """Identifica o conteúdo da réplica (linhas e marca de sincronização)"""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM inventario").fetchone()[0]
+        return f"{total}-{self._get_meta('marca_data_cadastro')}"
+
+    def _salvar_filtro(self):
+        if self.filtro.saturado:
+            self.filtro = FiltroBloom.construir(self._codigos())
+        self.filtro.salvar(self.caminho_filtro, self._assinatura())
+
+    def _gravar(self, linhas, substituir=False):
+        """Insere ou atualiza linhas na réplica (substituir=True apaga o conteúdo anterior)"""
+        valores = [tuple(linha.get(coluna) for coluna in COLUNAS) for linha in linhas]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            if substituir:
+                self._conn.execute("DELETE FROM inventario")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO inventario ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})",
+                valores,
+            )
+            self._conn.execute("COMMIT")
+            self.versao += 1
+            if substituir:
+                self.filtro = FiltroBloom.construir(linha.get("codigo") for linha in linhas)
+                self._indice_busca = None
+            else:
+                for linha in linhas:
+                    self.filtro.adicionar(linha.get("codigo"))
+                    if self._indice_busca is not None:
+                        self._indice_busca.adicionar(linha.get("codigo"), linha.get("nome"), linha.get("descricao"), linha.get("categoria"))
+
+    # Sincronização
+    def _get_meta(self, chave):
+        with self._lock:
+            linha = self._conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def _set_meta(self, chave, valor):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def _enviar_pendentes(self):
+        """Envia ao Supabase os cadastros e movimentações feitos offline, na ordem em que ocorreram"""
+        with self._lock:
+            fila = self._conn.execute("SELECT id, linha FROM pendentes ORDER BY id").fetchall()
+        for id_pendente, linha in fila:
+            try:
+                executar(add_item_async(json.loads(linha)))
+            except httpx.HTTPStatusError as erro:
+                # Rejeitado pelo servidor (ex.: código já cadastrado): descarta
+                if erro.response.status_code >= 500:
+                    raise
+            with self._lock:
+                self._conn.execute("DELETE FROM pendentes WHERE id = ?", (id_pendente,))
+
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT id, codigo, delta, operador FROM movimentos WHERE enviado = 0 ORDER BY id"
+            ).fetchall()
+        for id_movimento, codigo, delta, operador in fila:
+            try:
+                quantidade = executar(registrar_movimento_async(codigo, delta, operador))
+            except httpx.HTTPStatusError as erro:
+                if erro.response.status_code >= 500:
+                    raise
+                # Recusada pelo servidor: desfaz o delta aplicado localmente
+                with self._lock:
+                    self._conn.execute("BEGIN")
+                    self._conn.execute("UPDATE inventario SET quantidade = quantidade - ? WHERE codigo = ?", (delta, codigo))
+                    self._conn.execute("UPDATE movimentos SET enviado = -1 WHERE id = ?", (id_movimento,))
+                    self._conn.execute("COMMIT")
+                continue
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._conn.execute("UPDATE inventario SET quantidade = ? WHERE codigo = ?", (quantidade, codigo))
+                self._conn.execute("UPDATE movimentos SET enviado = 1 WHERE id = ?", (id_movimento,))
+                self._conn.execute("COMMIT")
+
+    def sincronizar(self, completo=False):
+        """Puxa do Supabase apenas as linhas novas; retorna False se estiver sem rede
+
+        Com completo=True a réplica é recarregada do zero (reflete exclusões).
+        """
+        # A marca vem só do que o servidor enviou, nunca de cadastros feitos offline
+        marca = None if completo else self._get_meta("marca_data_cadastro")
+        try:
+            self._enviar_pendentes()
+            filtros = {"data_cadastro": f"gte.{marca}"} if marca else {}
+            linhas = executar(selecionar_tudo_async(**filtros))
+        except httpx.HTTPError:
+            self.online = False
+            return False
+
+        # A marca é inclusiva: linhas repetidas na fronteira são apenas regravadas
+        self._gravar(linhas, substituir=completo)
+        if linhas:
+            self._set_meta("marca_data_cadastro", max(linha["data_cadastro"] for linha in linhas))
+        if linhas or completo:
+            self._salvar_filtro()
+        self.online = True
+        self.ultima_sincronizacao = datetime.now()
+        return True
+
+    def _laco_sincronizacao(self):
+        while not self._parar.wait(self.intervalo):
+            self.sincronizar()
+
+    def iniciar_sincronizacao(self):
+        """Sincroniza agora e inicia a sincronização periódica em segundo plano"""
+        self.sincronizar()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._laco_sincronizacao, name="replica-sync", daemon=True)
+            self._thread.start()
+
+    def parar_sincronizacao(self):
+        """Interrompe a sincronização periódica"""
+        self._parar.set()
+
+
+_replica = None
+_replica_lock = threading.Lock()
+
+
+def get_replica():
+    """Retorna a réplica compartilhada pelo processo, já sincronizando"""
+    global _replica
+    with _replica_lock:
+        if _replica is None:
+            _replica = ReplicaLocal()
+            _replica.iniciar_sincronizacao()
+    return _replica
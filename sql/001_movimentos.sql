@@ -0,0 +1,37 @@
+-- Livro de movimentações de estoque (somente inserção) e incremento atômico
+-- da quantidade. Executar no SQL Editor do Supabase.
+
+create table if not exists movimentos (
+    id bigserial primary key,
+    codigo text not null,
+    delta integer not null check (delta <> 0),
+    data timestamptz not null default now(),
+    operador text
+);
+
+create index if not exists movimentos_codigo_idx on movimentos (codigo);
+
+-- Aplica a movimentação numa única instrução UPDATE (sem ler-modificar-gravar
+-- no cliente) e registra o evento na mesma transação. Retorna a nova quantidade.
+create or replace function registrar_movimento(p_codigo text, p_delta integer, p_operador text default null)
+returns integer
+language plpgsql
+as $$
+declare
+    v_quantidade integer;
+begin
+    update inventario
+       set quantidade = quantidade + p_delta
+     where codigo = p_codigo
+       and quantidade + p_delta >= 0
+    returning quantidade into v_quantidade;
+
+    if not found then
+        raise exception 'Item % não cadastrado ou estoque insuficiente', p_codigo
+            using errcode = 'P0001';
+    end if;
+
+    insert into movimentos (codigo, delta, operador) values (p_codigo, p_delta, p_operador);
+    return v_quantidade;
+end;
+$$;
@@ -0,0 +1,37 @@
+-- Busca textual e aproximada (trigramas) sobre nome, categoria e descrição.
+-- Executar no SQL Editor do Supabase.
+
+create extension if not exists pg_trgm;
+
+alter table inventario add column if not exists busca tsvector
+    generated always as (
+        setweight(to_tsvector('portuguese', coalesce(nome, '')), 'A') ||
+        setweight(to_tsvector('portuguese', coalesce(categoria, '')), 'B') ||
+        setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'C')
+    ) stored;
+
+create index if not exists inventario_busca_idx on inventario using gin (busca);
+create index if not exists inventario_nome_trgm_idx on inventario using gin (nome gin_trgm_ops);
+
+-- Cada palavra da consulta vira um prefixo ("para" casa com "parafuso"); o
+-- operador <% cobre erros de digitação no nome usando o índice de trigramas.
+create or replace function buscar_itens_texto(p_consulta text, p_limite integer default 20)
+returns setof inventario
+language sql
+stable
+as $$
+    with consulta as (
+        select nullif(array_to_string(array(
+            select termo || ':*'
+              from regexp_split_to_table(lower(p_consulta), '[^[:alnum:]]+') as termo
+             where termo <> ''
+        ), ' & '), '') as prefixos
+    )
+    select i.*
+      from inventario i, consulta c
+     where (c.prefixos is not null and i.busca @@ to_tsquery('portuguese', c.prefixos))
+        or p_consulta <% i.nome
+     order by coalesce(ts_rank(i.busca, to_tsquery('portuguese', coalesce(c.prefixos, ''))), 0)
+            + word_similarity(p_consulta, i.nome) desc
+     limit p_limite;
+$$;